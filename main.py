@@ -5,16 +5,40 @@ import os
 import sys
 import re
 import math
+import csv
+import json
+import html
+import time
+import sqlite3
+import tarfile
+import zipfile
+import tempfile
+import argparse
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Callable, Iterator, Tuple
 from collections import Counter
 import difflib
 import threading
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 
 class PlagiarismEngine:
     def __init__(self):
         self.min_match_length = 5
+        self.context_words = 12  # source words kept either side of a matched sequence
+        # Windowed checking bounds the working set to memory_budget bytes: half for the
+        # submission window, half for the references matched against it in one pass.
+        # When memory_budget is unset, check_plagiarism loads everything and only files
+        # over large_document_bytes are streamed, using default_memory_budget.
+        self.memory_budget = None
+        self.default_memory_budget = 64 << 20
+        self.large_document_bytes = 10 << 20
+        self.window_overlap = 100
+        # Rough cost of one token held for matching: the str object, its list slot and
+        # the SequenceMatcher b2j / j2len entries that refer to it.
+        self.window_bytes_per_word = 200
+        self.read_chunk_chars = 1 << 20
         self.stop_words = {
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
             'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
@@ -37,7 +61,6 @@ class PlagiarismEngine:
             return '\n'.join([p.text for p in doc.paragraphs if p.text.strip()])
         except ImportError:
             try:
-                import zipfile
                 with zipfile.ZipFile(filepath) as docx:
                     xml_content = docx.read('word/document.xml')
                     text = re.sub(r'<[^>]+>', ' ', xml_content.decode('utf-8'))
@@ -46,26 +69,25 @@ class PlagiarismEngine:
                 raise Exception("DOCX support requires python-docx. Install with: pip install python-docx")
         
     
-    def extract_text_from_pdf(self, filepath: str) -> str:
+    def iter_pdf_pages(self, filepath: str) -> Iterator[str]:
         try:
             import pdfplumber
-            text = []
             with pdfplumber.open(filepath) as pdf:
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
-                        text.append(page_text)
-            return '\n'.join(text)
+                        yield page_text
         except ImportError:
             try:
                 from pypdf import PdfReader
                 reader = PdfReader(filepath)
-                text = []
                 for page in reader.pages:
-                    text.append(page.extract_text())
-                return '\n'.join(text)
+                    yield page.extract_text()
             except ImportError:
                 raise Exception("PDF support requires pdfplumber or pypdf. Install with: pip install pdfplumber")
+
+    def extract_text_from_pdf(self, filepath: str) -> str:
+        return '\n'.join(self.iter_pdf_pages(filepath))
     
     
     def extract_text(self, filepath: str) -> str:
@@ -78,17 +100,62 @@ class PlagiarismEngine:
             return self.extract_text_from_pdf(filepath)
         else:
             raise Exception(f"Unsupported file format: {ext}")
+
+    def iter_text_chunks(self, filepath: str) -> Iterator[str]:
+        ext = Path(filepath).suffix.lower()
+        if ext == '.txt':
+            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                while True:
+                    chunk = f.read(self.read_chunk_chars)
+                    if not chunk:
+                        break
+                    yield chunk
+        elif ext == '.pdf':
+            for page_text in self.iter_pdf_pages(filepath):
+                yield page_text + '\n'
+        else:
+            yield self.extract_text(filepath)
         
     def tokenize(self, text: str) -> List[str]:
         return re.findall(r'\b[a-z0-9]+\b', text.lower())
+
+    def iter_words(self, chunks: Iterable[str]) -> Iterator[str]:
+        # A word split across two chunks is carried over and tokenized with the next chunk.
+        carry = ''
+        for chunk in chunks:
+            chunk = carry + chunk.lower()
+            tail = re.search(r'\w+\Z', chunk)
+            carry = tail.group() if tail else ''
+            for match in re.finditer(r'\b[a-z0-9]+\b', chunk[:tail.start()] if tail else chunk):
+                yield match.group()
+        yield from self.tokenize(carry)
+
+    def get_memory_budget(self) -> int:
+        return self.memory_budget or self.default_memory_budget
+
+    def get_window_size(self) -> int:
+        return max(self.window_overlap * 2, self.get_memory_budget() // 2 // self.window_bytes_per_word)
+
+    def iter_windows(self, words: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+        size = self.get_window_size()
+        overlap = min(self.window_overlap, size // 2)
+        start = 0
+        window = []
+        for word in words:
+            window.append(word)
+            if len(window) == size:
+                yield start, window
+                start += size - overlap
+                window = window[size - overlap:]
+        if window and (start == 0 or len(window) > overlap):
+            yield start, window
     
     def calculate_cosine_similarity(self, text1: str, text2: str) -> float:
-        words1 = self.tokenize(text1)
-        words2 = self.tokenize(text2)
-        
-        freq1 = Counter(words1)
-        freq2 = Counter(words2)
-        
+        return self.calculate_cosine_similarity_from_counts(
+            Counter(self.tokenize(text1)), Counter(self.tokenize(text2))
+        )
+
+    def calculate_cosine_similarity_from_counts(self, freq1: Counter, freq2: Counter) -> float:
         all_words = set(freq1.keys()).union(set(freq2.keys()))
         vec1 = [freq1.get(word, 0) for word in all_words]
         vec2 = [freq2.get(word, 0) for word in all_words]
@@ -101,6 +168,14 @@ class PlagiarismEngine:
             return 0.0
         return (dot_product / (magnitude1 * magnitude2)) * 100
     
+    def get_context(self, words: List[str], start: int, length: int) -> Dict:
+        return {
+            'before': ' '.join(words[max(0, start - self.context_words):start]),
+            'after': ' '.join(words[start + length:start + length + self.context_words]),
+            'more_before': start > self.context_words,
+            'more_after': start + length + self.context_words < len(words)
+        }
+
     def find_common_sequences(self, text1: str, text2: str) -> List[Dict]:
         words1 = self.tokenize(text1)
         words2 = self.tokenize(text2)
@@ -114,31 +189,151 @@ class PlagiarismEngine:
                 matches.append({
                     'text': matched_text,
                     'length': match.size,
-                    'position': match.a
+                    'position': match.a,
+                    'source_position': match.b,
+                    'source_context': self.get_context(words2, match.b, match.size)
                 })
         
         return matches
     
+    def iter_similar_sources(self, freq: Counter, database: List[Dict]) -> Iterator[Tuple[Dict, float]]:
+        # A CorpusIndex in the database pre-selects its candidates from its term
+        # postings instead of having every document tokenized here.
+        for doc in database:
+            if isinstance(doc, CorpusIndex):
+                yield from doc.find_similar(freq)
+                continue
+            similarity = self.calculate_cosine_similarity_from_counts(
+                freq, Counter(self.tokenize(doc.get('text', '')))
+            )
+            if similarity > 5:
+                yield doc, similarity
+
     def check_plagiarism(self, text: str, database: List[Dict]) -> Dict:
+        if self.memory_budget:
+            return self.check_plagiarism_windowed(lambda: [text], database)
+
+        words = self.tokenize(text)
         results = {
             'overall_similarity': 0,
-            'total_words': len(self.tokenize(text)),
+            'total_words': len(words),
             'matches': []
         }
         
-        for doc in database:
-            doc_text = doc.get('text', '')
-            similarity = self.calculate_cosine_similarity(text, doc_text)
-            
-            if similarity > 5:
-                sequences = self.find_common_sequences(text, doc_text)
-                results['matches'].append({
-                    'source': doc.get('source', 'Unknown'),
-                    'url': doc.get('url', ''),
-                    'similarity': round(similarity, 2),
-                    'matched_sequences': sequences[:5]
-                })
+        for doc, similarity in self.iter_similar_sources(Counter(words), database):
+            sequences = self.find_common_sequences(text, doc.get('text', ''))
+            results['matches'].append({
+                'source': doc.get('source', 'Unknown'),
+                'url': doc.get('url', ''),
+                'similarity': round(similarity, 2),
+                'matched_sequences': sequences[:5]
+            })
         
+        return self.finalize_results(results)
+
+    def should_stream(self, filepath: str) -> bool:
+        return bool(self.memory_budget) or os.path.getsize(filepath) > self.large_document_bytes
+
+    def check_file(self, filepath: str, database: List[Dict]) -> Dict:
+        return self.check_plagiarism_windowed(lambda: self.iter_text_chunks(filepath), database)
+
+    def check_plagiarism_windowed(self, read_chunks: Callable[[], Iterable[str]], database: List[Dict]) -> Dict:
+        # The submission is streamed once to build its word counts (bounded by vocabulary,
+        # not length) for the cosine scores, then once more per group of similar sources
+        # to find matched sequences. Sources are grouped so their tokens and matchers fit
+        # in half the memory budget; a single source larger than that gets its own pass.
+        freq = Counter()
+        total_words = 0
+        for word in self.iter_words(read_chunks()):
+            freq[word] += 1
+            total_words += 1
+
+        results = {
+            'overall_similarity': 0,
+            'total_words': total_words,
+            'matches': []
+        }
+        group_budget = self.get_memory_budget() // 2
+        group = []
+        group_cost = 0
+        for doc, similarity in self.iter_similar_sources(freq, database):
+            doc_words = self.tokenize(doc.get('text', ''))
+            cost = len(doc_words) * self.window_bytes_per_word
+            if group and group_cost + cost > group_budget:
+                results['matches'].extend(self.match_windowed(read_chunks, group))
+                group = []
+                group_cost = 0
+            group.append((doc, similarity, doc_words))
+            group_cost += cost
+        if group:
+            results['matches'].extend(self.match_windowed(read_chunks, group))
+
+        return self.finalize_results(results)
+
+    def match_windowed(self, read_chunks: Callable[[], Iterable[str]],
+                       group: List[Tuple[Dict, float, List[str]]]) -> List[Dict]:
+        # Blocks on the same diagonal that touch across a window boundary are merged
+        # back into a single sequence; blocks lying wholly inside the overlap with the
+        # previous window were already seen and are skipped. Any other block is clipped
+        # to start after the submission words already covered, so sequences never
+        # overlap in the submission, as with a whole-document SequenceMatcher.
+        states = [{
+            'words': doc_words,
+            'matcher': difflib.SequenceMatcher(None, '', doc_words),
+            'sequences': [],
+            'block': None,
+            'covered': 0
+        } for _, _, doc_words in group]
+
+        def close_block(state):
+            block = state['block']
+            state['block'] = None
+            if block and block[2] >= self.min_match_length:
+                position, source_position, size = block
+                state['sequences'].append({
+                    'text': ' '.join(state['words'][source_position:source_position + size]),
+                    'length': size,
+                    'position': position,
+                    'source_position': source_position,
+                    'source_context': self.get_context(state['words'], source_position, size)
+                })
+
+        frontier = 0
+        for start, window in self.iter_windows(self.iter_words(read_chunks())):
+            active = [state for state in states if len(state['sequences']) < 5]
+            if not active:
+                break
+            for state in active:
+                state['matcher'].set_seq1(window)
+                for a, b, size in state['matcher'].get_matching_blocks()[:-1]:
+                    position = start + a
+                    block = state['block']
+                    if block and position - b == block[0] - block[1] and position <= block[0] + block[2]:
+                        block[2] = max(block[2], position + size - block[0])
+                        state['covered'] = block[0] + block[2]
+                        continue
+                    if position + size <= max(frontier, state['covered']):
+                        continue
+                    if position < state['covered']:
+                        shift = state['covered'] - position
+                        position, b, size = position + shift, b + shift, size - shift
+                    close_block(state)
+                    state['block'] = [position, b, size]
+                    state['covered'] = position + size
+            frontier = start + len(window)
+
+        matches = []
+        for (doc, similarity, _), state in zip(group, states):
+            close_block(state)
+            matches.append({
+                'source': doc.get('source', 'Unknown'),
+                'url': doc.get('url', ''),
+                'similarity': round(similarity, 2),
+                'matched_sequences': state['sequences'][:5]
+            })
+        return matches
+
+    def finalize_results(self, results: Dict) -> Dict:
         if results['matches']:
             total_weight = sum(m['similarity'] for m in results['matches'])
             weighted_sum = sum(m['similarity'] ** 2 for m in results['matches'])
@@ -185,15 +380,576 @@ def get_sample_database() -> List[Dict]:
     ]
 
 
+def interpret_score(score: float) -> str:
+    if score < 15:
+        return "✓ LOW SIMILARITY - Acceptable level for academic work"
+    elif score < 30:
+        return "⚠ MODERATE SIMILARITY - Review recommended"
+    return "✗ HIGH SIMILARITY - Significant concern"
+
+
+class ReportExporter(ABC):
+    # Exporters write one report entry at a time straight to the open file, so a
+    # cohort of any size is exported with constant memory. An entry is a dict
+    # with 'document', 'results' and optionally the submitted 'text'.
+    extension = ''
+    label = ''
+
+    def __init__(self, engine: 'PlagiarismEngine' = None):
+        self.engine = engine or PlagiarismEngine()
+
+    def begin(self, f):
+        pass
+
+    @abstractmethod
+    def write_entry(self, f, entry: Dict, index: int):
+        pass
+
+    def end(self, f, count: int):
+        pass
+
+    def export(self, filepath: str, entries: Iterable[Dict]) -> int:
+        count = 0
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            self.begin(f)
+            for entry in entries:
+                self.write_entry(f, entry, count)
+                count += 1
+            self.end(f, count)
+        return count
+
+
+class TextReportExporter(ReportExporter):
+    extension = '.txt'
+    label = 'Text Files'
+
+    def write_entry(self, f, entry: Dict, index: int):
+        results = entry['results']
+        if index:
+            f.write("\n\n")
+        f.write("=" * 70 + "\n")
+        f.write("PLAGIARISM DETECTION REPORT\n")
+        f.write("=" * 70 + "\n")
+        f.write(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Document: {entry.get('document', 'Pasted Text')}\n\n")
+        f.write("SUMMARY\n")
+        f.write("-" * 70 + "\n")
+        f.write(f"Overall Similarity Score: {results['overall_similarity']}%\n")
+        f.write(f"Total Words Analyzed: {results['total_words']}\n")
+        f.write(f"Number of Sources Matched: {len(results['matches'])}\n\n")
+        f.write("INTERPRETATION\n")
+        f.write("-" * 70 + "\n")
+        f.write(interpret_score(results['overall_similarity']) + "\n\n")
+        if results['matches']:
+            f.write("DETAILED MATCHES\n")
+            f.write("-" * 70 + "\n")
+            for idx, match in enumerate(results['matches'], 1):
+                f.write(f"\nMatch #{idx}\n")
+                f.write(f"Source: {match['source']}\n")
+                f.write(f"URL: {match['url']}\n")
+                f.write(f"Similarity: {match['similarity']}%\n")
+
+                if match['matched_sequences']:
+                    f.write("\nMatched Sequences:\n")
+                    for seq in match['matched_sequences']:
+                        text = seq['text'][:100] + '...' if len(seq['text']) > 100 else seq['text']
+                        f.write(f"• \"{text}\" ({seq['length']} words)\n")
+                f.write("-" * 70 + "\n")
+
+        f.write("\n" + "=" * 70 + "\n")
+
+
+class JsonReportExporter(ReportExporter):
+    extension = '.json'
+    label = 'JSON Files'
+
+    def begin(self, f):
+        f.write('[\n')
+
+    def write_entry(self, f, entry: Dict, index: int):
+        if index:
+            f.write(',\n')
+        json.dump({
+            'document': entry.get('document', 'Pasted Text'),
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'interpretation': interpret_score(entry['results']['overall_similarity']),
+            **entry['results']
+        }, f, ensure_ascii=False, indent=2)
+
+    def end(self, f, count: int):
+        f.write('\n]\n')
+
+
+class CsvReportExporter(ReportExporter):
+    extension = '.csv'
+    label = 'CSV Files'
+    columns = [
+        'document', 'overall_similarity', 'total_words', 'source', 'url',
+        'similarity', 'sequence', 'sequence_length', 'position', 'source_position'
+    ]
+
+    def begin(self, f):
+        self.writer = csv.writer(f)
+        self.writer.writerow(self.columns)
+
+    def write_entry(self, f, entry: Dict, index: int):
+        results = entry['results']
+        document = entry.get('document', 'Pasted Text')
+        summary = [document, results['overall_similarity'], results['total_words']]
+        if not results['matches']:
+            self.writer.writerow(summary + [''] * (len(self.columns) - len(summary)))
+        for match in results['matches']:
+            source = summary + [match['source'], match['url'], match['similarity']]
+            if not match['matched_sequences']:
+                self.writer.writerow(source + ['', '', '', ''])
+            for seq in match['matched_sequences']:
+                self.writer.writerow(source + [
+                    seq['text'], seq['length'], seq['position'], seq.get('source_position', '')
+                ])
+
+
+class HtmlReportExporter(ReportExporter):
+    extension = '.html'
+    label = 'HTML Files'
+
+    def begin(self, f):
+        f.write("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Plagiarism Detection Report</title>
+<style>
+body { font-family: Arial, sans-serif; background: #f0f0f0; color: #2d3748; margin: 0; padding: 20px; }
+.report { background: white; border: 1px solid #e2e8f0; margin: 0 auto 20px; max-width: 1000px; padding: 20px; }
+h1 { background: #667eea; color: white; margin: -20px -20px 20px; padding: 15px 20px; }
+h2 { color: #667eea; }
+.score { font-size: 36px; font-weight: bold; }
+.low { color: #48bb78; } .moderate { color: #ed8936; } .high { color: #f56565; }
+table { border-collapse: collapse; width: 100%; table-layout: fixed; margin-bottom: 10px; }
+th, td { border: 1px solid #e2e8f0; padding: 6px; text-align: left; vertical-align: top; }
+th { background: #f7fafc; }
+mark { background: #fef5e7; color: #c53030; }
+</style>
+</head>
+<body>
+""")
+
+    def end(self, f, count: int):
+        f.write("</body>\n</html>\n")
+
+    def mark(self, before: str, matched: str, after: str, more_before: bool = False, more_after: bool = False) -> str:
+        parts = [
+            '…' if more_before else '',
+            html.escape(before),
+            f"<mark>{html.escape(matched)}</mark>",
+            html.escape(after),
+            '…' if more_after else ''
+        ]
+        return ' '.join(part for part in parts if part)
+
+    def highlight(self, words: List[str], start: int, length: int) -> str:
+        context = self.engine.context_words
+        return self.mark(
+            ' '.join(words[max(0, start - context):start]),
+            ' '.join(words[start:start + length]),
+            ' '.join(words[start + length:start + length + context]),
+            start > context,
+            start + length + context < len(words)
+        )
+
+    def write_entry(self, f, entry: Dict, index: int):
+        results = entry['results']
+        score = results['overall_similarity']
+        level = 'low' if score < 15 else 'moderate' if score < 30 else 'high'
+        words = self.engine.tokenize(entry.get('text', ''))
+
+        f.write('<div class="report">\n<h1>Plagiarism Detection Report</h1>\n')
+        f.write(f"<p>Document: <strong>{html.escape(entry.get('document', 'Pasted Text'))}</strong><br>\n")
+        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>\n")
+        f.write(f'<p class="score {level}">{score}%</p>\n')
+        f.write(f'<p class="{level}">{html.escape(interpret_score(score))}</p>\n')
+        f.write(f"<p>Total Words Analyzed: {results['total_words']}<br>\n")
+        f.write(f"Number of Sources Matched: {len(results['matches'])}</p>\n")
+
+        for idx, match in enumerate(results['matches'], 1):
+            f.write(f"<h2>Match #{idx}: {html.escape(match['source'])}</h2>\n<p>")
+            if match['url']:
+                url = html.escape(match['url'])
+                f.write(f'URL: <a href="{url}">{url}</a><br>\n')
+            f.write(f"Similarity: {match['similarity']}%</p>\n")
+            if not match['matched_sequences']:
+                continue
+
+            f.write('<table>\n<tr><th>Submitted Document</th><th>Source</th></tr>\n')
+            for seq in match['matched_sequences']:
+                left = self.highlight(words, seq['position'], seq['length']) if words else self.mark('', seq['text'], '')
+                context = seq.get('source_context')
+                right = self.mark(context['before'], seq['text'], context['after'],
+                                  context['more_before'], context['more_after']) if context else self.mark('', seq['text'], '')
+                f.write(f'<tr><td>{left}</td><td>{right}</td></tr>\n')
+            f.write('</table>\n')
+
+        if not results['matches']:
+            f.write('<p class="low">✓ No significant matches found.</p>\n')
+        f.write('</div>\n')
+
+
+REPORT_EXPORTERS = {
+    exporter.extension: exporter
+    for exporter in (TextReportExporter, JsonReportExporter, CsvReportExporter, HtmlReportExporter)
+}
+
+
+def get_exporter(filepath: str, engine: 'PlagiarismEngine' = None) -> ReportExporter:
+    # Unknown extensions (.md, .log, ...) get a plain text report.
+    ext = Path(filepath).suffix.lower()
+    if ext == '.htm':
+        ext = '.html'
+    return REPORT_EXPORTERS.get(ext, TextReportExporter)(engine)
+
+
+def export_results(filepath: str, results: Dict, document: str = 'Pasted Text', text: str = '',
+                   engine: 'PlagiarismEngine' = None):
+    get_exporter(filepath, engine).export(
+        filepath, [{'document': document, 'results': results, 'text': text}]
+    )
+
+
+def export_cohort(filepath: str, entries: Iterable[Dict], engine: 'PlagiarismEngine' = None) -> int:
+    # entries may be a generator that checks each submission on demand; only the
+    # entry currently being written is ever held in memory.
+    return get_exporter(filepath, engine).export(filepath, entries)
+
+
+SUPPORTED_EXTENSIONS = ('.txt', '.docx', '.pdf')
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+CORPUS_DB = str(Path(__file__).with_name('corpus.db'))
+
+
+class CorpusIndex:
+    # Reference documents ingested from disk, keyed by absolute file path (or
+    # "archive::member" for archive entries), with an inverted index of term counts.
+    # Size and mtime are stored so an interrupted ingest can resume by skipping
+    # entries that are already current.
+    def __init__(self, db_path: str = CORPUS_DB):
+        # Checks run on a worker thread while the app owns the index.
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                words INTEGER NOT NULL,
+                norm REAL NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+        ''')
+        self.connection.commit()
+
+    def get_current(self) -> Dict[str, Tuple[int, float]]:
+        rows = self.connection.execute('SELECT key, size, mtime FROM documents WHERE error IS NULL')
+        return {key: (size, mtime) for key, size, mtime in rows}
+
+    def add(self, rows: List[Dict]):
+        with self.connection:
+            for row in rows:
+                self.connection.execute(
+                    'DELETE FROM postings WHERE doc_id IN (SELECT id FROM documents WHERE key = ?)', (row['key'],)
+                )
+                self.connection.execute('DELETE FROM documents WHERE key = ?', (row['key'],))
+                cursor = self.connection.execute(
+                    'INSERT INTO documents (key, source, url, text, words, norm, size, mtime, error) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (row['key'], row['source'], row['url'], row['text'], row['words'],
+                     row['norm'], row['size'], row['mtime'], row['error'])
+                )
+                self.connection.executemany(
+                    'INSERT INTO postings (term, doc_id, count) VALUES (?, ?, ?)',
+                    ((term, cursor.lastrowid, count) for term, count in row['terms'])
+                )
+
+    def find_similar(self, freq: Counter, threshold: float = 5) -> Iterator[Tuple[Dict, float]]:
+        # Cosine similarity computed from the postings of the submission's terms, so
+        # only documents sharing a term are touched and only candidates are loaded.
+        magnitude = math.sqrt(sum(count ** 2 for count in freq.values()))
+        if magnitude == 0:
+            return
+        self.connection.execute('CREATE TEMP TABLE IF NOT EXISTS query_terms (term TEXT PRIMARY KEY, count INTEGER)')
+        # Filling the temp table opens a transaction; committing it when the block
+        # exits releases the read snapshot, so documents ingested by another process
+        # while the index is open are seen by the next check.
+        with self.connection:
+            self.connection.execute('DELETE FROM query_terms')
+            self.connection.executemany('INSERT INTO query_terms (term, count) VALUES (?, ?)', freq.items())
+            scores = self.connection.execute('''
+                SELECT d.id, SUM(p.count * q.count) / d.norm
+                FROM query_terms q
+                JOIN postings p ON p.term = q.term
+                JOIN documents d ON d.id = p.doc_id
+                WHERE d.error IS NULL AND d.norm > 0
+                GROUP BY d.id
+            ''').fetchall()
+        for doc_id, score in scores:
+            similarity = score / magnitude * 100
+            if similarity > threshold:
+                key, source, url, text = self.connection.execute(
+                    'SELECT key, source, url, text FROM documents WHERE id = ?', (doc_id,)
+                ).fetchone()
+                yield {'id': key, 'source': source, 'url': url, 'text': text}, similarity
+
+    def close(self):
+        self.connection.close()
+
+
+def is_archive(filepath: str) -> bool:
+    return filepath.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def iter_corpus_entries(paths: Iterable[str]) -> Iterator[Tuple[str, int, float, Callable, str]]:
+    # Yields (key, size, mtime, load, error) for every supported file under the given
+    # files, directories and archives. load() returns (path, data) and is only called
+    # for entries that need ingesting, so skipped archive members are never read.
+    # Entries that cannot be read are yielded with an error instead of stopping the walk.
+    for root in paths:
+        root = os.path.realpath(root)
+        if os.path.isdir(root):
+            files = (os.path.join(folder, name)
+                     for folder, _, names in os.walk(root) for name in sorted(names))
+        else:
+            files = [root]
+
+        for filepath in files:
+            if is_archive(filepath):
+                yield from iter_archive_entries(os.path.realpath(filepath))
+            elif Path(filepath).suffix.lower() in SUPPORTED_EXTENSIONS:
+                filepath = os.path.realpath(filepath)
+                try:
+                    stat = os.stat(filepath)
+                except OSError as e:
+                    yield filepath, 0, 0.0, None, str(e)
+                    continue
+                yield filepath, stat.st_size, stat.st_mtime, lambda filepath=filepath: (filepath, None), None
+
+
+def iter_archive_entries(filepath: str) -> Iterator[Tuple[str, int, float, Callable, str]]:
+    try:
+        if filepath.lower().endswith('.zip'):
+            with zipfile.ZipFile(filepath) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or Path(info.filename).suffix.lower() not in SUPPORTED_EXTENSIONS:
+                        continue
+                    mtime = datetime(*info.date_time).timestamp()
+                    yield (f"{filepath}::{info.filename}", info.file_size, mtime,
+                           lambda info=info: (info.filename, archive.read(info)), None)
+        else:
+            with tarfile.open(filepath) as archive:
+                for member in archive:
+                    if not member.isfile() or Path(member.name).suffix.lower() not in SUPPORTED_EXTENSIONS:
+                        continue
+                    yield (f"{filepath}::{member.name}", member.size, float(member.mtime),
+                           lambda member=member: (member.name, archive.extractfile(member).read()), None)
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+        yield filepath, 0, 0.0, None, f"Unreadable archive: {e}"
+
+
+def extract_corpus_entry(task: Tuple[str, str, bytes]) -> Tuple[str, str, int, List[Tuple[str, int]], str]:
+    key, filepath, data = task
+    engine = PlagiarismEngine()
+    try:
+        if data is None:
+            text = engine.extract_text(filepath)
+        else:
+            with tempfile.NamedTemporaryFile(suffix=Path(filepath).suffix, delete=False) as tmp:
+                tmp.write(data)
+            try:
+                text = engine.extract_text(tmp.name)
+            finally:
+                os.remove(tmp.name)
+        words = engine.tokenize(text)
+        return key, text, len(words), list(Counter(words).items()), None
+    except Exception as e:
+        return key, '', 0, [], str(e)
+
+
+def ingest_corpus(paths: Iterable[str], db_path: str = CORPUS_DB, workers: int = None,
+                  batch_size: int = 200, progress: Callable[[Dict], None] = None,
+                  batch_bytes: int = 64 << 20) -> Dict:
+    # Text extraction and tokenization run in a process pool one batch at a time;
+    # each batch is indexed and committed before the next is read, which makes the
+    # ingest resumable at batch granularity. A batch is flushed after batch_size
+    # documents or once the archive members read into it pass batch_bytes.
+    index = CorpusIndex(db_path)
+    current = index.get_current()
+    stats = {'ingested': 0, 'skipped': 0, 'failed': 0, 'bytes': 0, 'seconds': 0.0,
+             'files_per_second': 0.0, 'mb_per_second': 0.0}
+    started = time.perf_counter()
+
+    def make_row(key, size, mtime, text='', words=0, terms=(), error=None):
+        stats['failed' if error else 'ingested'] += 1
+        stats['bytes'] += size
+        return {
+            'key': key, 'source': Path(key.split('::')[-1]).stem, 'url': key,
+            'text': text, 'words': words, 'terms': terms,
+            'norm': math.sqrt(sum(count ** 2 for _, count in terms)),
+            'size': size, 'mtime': mtime, 'error': error
+        }
+
+    def flush(batch, failed):
+        meta = {key: (size, mtime) for key, size, mtime, _, _ in batch}
+        tasks = [(key, filepath, data) for key, _, _, filepath, data in batch]
+        chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+        rows = failed
+        for key, text, words, terms, error in executor.map(extract_corpus_entry, tasks, chunksize=chunksize):
+            rows.append(make_row(key, *meta[key], text, words, terms, error))
+        index.add(rows)
+        stats['seconds'] = time.perf_counter() - started
+        if stats['seconds'] > 0:
+            stats['files_per_second'] = round(stats['ingested'] / stats['seconds'], 2)
+            stats['mb_per_second'] = round(stats['bytes'] / stats['seconds'] / (1 << 20), 2)
+        if progress:
+            progress(stats)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batch = []
+            failed = []
+            buffered = 0
+            for key, size, mtime, load, error in iter_corpus_entries(paths):
+                if current.get(key) == (size, mtime):
+                    stats['skipped'] += 1
+                    continue
+                if not error:
+                    try:
+                        filepath, data = load()
+                    except Exception as e:
+                        error = str(e)
+                if error:
+                    failed.append(make_row(key, size, mtime, error=error))
+                else:
+                    batch.append((key, size, mtime, filepath, data))
+                    buffered += len(data or b'')
+                if len(batch) + len(failed) >= batch_size or buffered >= batch_bytes:
+                    flush(batch, failed)
+                    batch = []
+                    failed = []
+                    buffered = 0
+            if batch or failed:
+                flush(batch, failed)
+    finally:
+        index.close()
+
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def load_reference_database(db_path: str = CORPUS_DB) -> List:
+    # The corpus index is opened, not loaded: it pre-selects its own candidates
+    # during each check (see PlagiarismEngine.iter_similar_sources).
+    database = get_sample_database()
+    if os.path.exists(db_path):
+        database.append(CorpusIndex(db_path))
+    return database
+
+
+def ingest_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog='main.py ingest',
+        description='Bulk-load TXT, DOCX and PDF reference documents into the corpus database.'
+    )
+    parser.add_argument('paths', nargs='+', help='files, directories or archives (.zip, .tar, .tar.gz) to ingest')
+    parser.add_argument('--db', default=CORPUS_DB, help=f'corpus database (default: {CORPUS_DB})')
+    parser.add_argument('--workers', type=int, default=None, help='extraction processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=200, help='documents committed per batch')
+    parser.add_argument('--batch-mb', type=int, default=64,
+                        help='flush a batch once the archive members read into it pass this many MB')
+    args = parser.parse_args(argv)
+
+    def report(stats):
+        print(f"Ingested {stats['ingested']} files ({stats['bytes'] / (1 << 20):.1f} MB), "
+              f"skipped {stats['skipped']}, failed {stats['failed']} - "
+              f"{stats['files_per_second']} files/s, {stats['mb_per_second']} MB/s")
+
+    stats = ingest_corpus(args.paths, args.db, args.workers, args.batch_size, report, args.batch_mb << 20)
+    print(f"Done in {stats['seconds']}s - {stats['ingested']} ingested, "
+          f"{stats['skipped']} already up to date, {stats['failed']} failed")
+    return 0 if not stats['failed'] else 1
+
+
+def iter_cohort_entries(paths: Iterable[str], engine: 'PlagiarismEngine', database: List,
+                        exclude: str = None) -> Iterator[Dict]:
+    # exclude is the report being written, which may sit inside a scanned folder.
+    exclude = os.path.realpath(exclude) if exclude else None
+    for root in paths:
+        if os.path.isdir(root):
+            files = (os.path.join(folder, name)
+                     for folder, _, names in os.walk(root) for name in sorted(names))
+        else:
+            files = [root]
+
+        for filepath in files:
+            if Path(filepath).suffix.lower() not in SUPPORTED_EXTENSIONS or os.path.realpath(filepath) == exclude:
+                continue
+            try:
+                if engine.should_stream(filepath):
+                    text = ''
+                    results = engine.check_file(filepath, database)
+                else:
+                    text = engine.extract_text(filepath)
+                    results = engine.check_plagiarism(text, database)
+            except Exception as e:
+                print(f"Skipped {filepath}: {e}", file=sys.stderr)
+                continue
+            print(f"Checked {filepath} - {results['overall_similarity']}%")
+            yield {'document': filepath, 'results': results, 'text': text}
+
+
+def add_memory_budget_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--memory-budget', type=lambda mb: int(float(mb) * (1 << 20)), default=None,
+                        metavar='MB', help='check every document in windows within this working memory')
+
+
+def export_cohort_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog='main.py export-cohort',
+        description='Check every TXT, DOCX and PDF submission under the given paths and write one combined report.'
+    )
+    parser.add_argument('output', help='report file; the format follows the extension (.txt, .json, .csv, .html)')
+    parser.add_argument('paths', nargs='+', help='submission files or directories')
+    parser.add_argument('--db', default=CORPUS_DB, help=f'corpus database (default: {CORPUS_DB})')
+    add_memory_budget_argument(parser)
+    args = parser.parse_args(argv)
+
+    engine = PlagiarismEngine()
+    engine.memory_budget = args.memory_budget
+    database = load_reference_database(args.db)
+    count = export_cohort(args.output, iter_cohort_entries(args.paths, engine, database, args.output), engine)
+    print(f"Exported {count} reports to {args.output}")
+    return 0 if count else 1
+
+
 class PlagiarismCheckerApp:
-    def __init__(self, root):
+    def __init__(self, root, memory_budget: int = None):
         self.root = root
         self.root.title("Plagiarism Checker - Academic Integrity Tool")
         self.root.geometry("1000x700")
         self.root.configure(bg='#f0f0f0')
         self.setup_styles()
         self.engine = PlagiarismEngine()
-        self.database = get_sample_database()
+        self.engine.memory_budget = memory_budget
+        self.database = load_reference_database()
         self.current_file = None
         self.current_text = None
         self.results = None
@@ -326,10 +1082,13 @@ class PlagiarismCheckerApp:
         self.status_bar.config(text="Ready")
         
     def run_check(self):
+        stream = False
         if self.current_file:
             self.status_bar.config(text="Extracting text from file...")
             try:
-                text = self.engine.extract_text(self.current_file)
+                # Large files are streamed from disk in windows instead of being loaded whole.
+                stream = self.engine.should_stream(self.current_file)
+                text = None if stream else self.engine.extract_text(self.current_file)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to read file: {str(e)}")
                 self.status_bar.config(text="Error reading file")
@@ -337,20 +1096,24 @@ class PlagiarismCheckerApp:
         else:
             text = self.text_input.get(1.0, tk.END).strip()
         
-        if not text or len(text) < 50:
+        if not stream and (not text or len(text) < 50):
             messagebox.showwarning("Warning", "Please provide a document or text (minimum 50 characters)")
             return
         
         self.current_text = text
         self.check_button.config(state='disabled', text="⏳ Analyzing...")
-        self.status_bar.config(text="Analyzing document for plagiarism...")
+        self.status_bar.config(text="Analyzing large document in memory-bounded windows..." if stream
+                               else "Analyzing document for plagiarism...")
         thread = threading.Thread(target=self.perform_check)
         thread.daemon = True
         thread.start()
     
     def perform_check(self):
         try:
-            results = self.engine.check_plagiarism(self.current_text, self.database)
+            if self.current_text is None:
+                results = self.engine.check_file(self.current_file, self.database)
+            else:
+                results = self.engine.check_plagiarism(self.current_text, self.database)
             self.results = results
             self.root.after(0, self.display_results)
         
@@ -424,65 +1187,39 @@ class PlagiarismCheckerApp:
     def export_report(self):
         if not self.results:
             return
+        filetypes = [(exporter.label, f"*{ext}") for ext, exporter in REPORT_EXPORTERS.items()]
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
+            filetypes=filetypes + [("All Files", "*.*")],
             initialfile=f"plagiarism_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         )
         
         if not filename:
             return
         
-        report = []
-        report.append("=" * 70)
-        report.append("PLAGIARISM DETECTION REPORT")
-        report.append("=" * 70)
-        report.append(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append(f"Document: {Path(self.current_file).name if self.current_file else 'Pasted Text'}")
-        report.append("")
-        report.append("SUMMARY")
-        report.append("-" * 70)
-        report.append(f"Overall Similarity Score: {self.results['overall_similarity']}%")
-        report.append(f"Total Words Analyzed: {self.results['total_words']}")
-        report.append(f"Number of Sources Matched: {len(self.results['matches'])}")
-        report.append("")
-        score = self.results['overall_similarity']
-        report.append("INTERPRETATION")
-        report.append("-" * 70)
-        if score < 15:
-            report.append("✓ LOW SIMILARITY - Acceptable level for academic work")
-        elif score < 30:
-            report.append("⚠ MODERATE SIMILARITY - Review recommended")
-        else:
-            report.append("✗ HIGH SIMILARITY - Significant concern")
-        report.append("")
-        if self.results['matches']:
-            report.append("DETAILED MATCHES")
-            report.append("-" * 70)
-            for idx, match in enumerate(self.results['matches'], 1):
-                report.append(f"\nMatch #{idx}")
-                report.append(f"Source: {match['source']}")
-                report.append(f"URL: {match['url']}")
-                report.append(f"Similarity: {match['similarity']}%")
-                
-                if match['matched_sequences']:
-                    report.append("\nMatched Sequences:")
-                    for seq in match['matched_sequences']:
-                        report.append(f"• \"{seq['text'][:100]}...\" ({seq['length']} words)")
-                report.append("-" * 70)
-        
-        report.append("\n" + "=" * 70)
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(report))
+            export_results(
+                filename, self.results,
+                document=Path(self.current_file).name if self.current_file else 'Pasted Text',
+                text=self.current_text or '', engine=self.engine
+            )
             messagebox.showinfo("Success", f"Report exported successfully!\n\n{filename}")
             self.status_bar.config(text=f"Report exported to {Path(filename).name}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export report: {str(e)}")
 
 def main():
+    commands = {'ingest': ingest_main, 'export-cohort': export_cohort_main}
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        sys.exit(commands[sys.argv[1]](sys.argv[2:]))
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description='Plagiarism Checker desktop application. Subcommands: ingest, export-cohort.'
+    )
+    add_memory_budget_argument(parser)
+    args = parser.parse_args()
     root = tk.Tk()
-    app = PlagiarismCheckerApp(root)
+    app = PlagiarismCheckerApp(root, args.memory_budget)
     root.update_idletasks()
     width = root.winfo_width()
     height = root.winfo_height()
@@ -0,0 +1,126 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import PlagiarismEngine, get_sample_database
+
+
+def build_submission(database, seed=1):
+    rng = random.Random(seed)
+    filler = ['alpha', 'beta', 'gamma', 'delta', 'omega', 'zeta', 'kappa']
+    pad = lambda n: ' '.join(rng.choice(filler) for _ in range(n))
+    return ' '.join([
+        pad(30), database[0]['text'], pad(40), database[2]['text'],
+        database[1]['text'], pad(20)
+    ])
+
+
+def sequence_spans(results):
+    return [
+        (m['source'], m['similarity'],
+         [(s['position'], s['source_position'], s['length'], s['text']) for s in m['matched_sequences']])
+        for m in results['matches']
+    ]
+
+
+class IterWordsTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = PlagiarismEngine()
+
+    def test_matches_tokenize_for_arbitrary_splits(self):
+        rng = random.Random(7)
+        text = build_submission(get_sample_database()) + "\nCafé_x\nend 42\n\n"
+        text = text.replace('. ', '.\n')
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 40)))
+            chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+            self.assertEqual(list(self.engine.iter_words(chunks)), self.engine.tokenize(''.join(chunks)))
+
+    def test_words_ending_pages_are_not_joined(self):
+        pages = ['the quick brown fox\n', 'jumps over the lazy dog\n', 'the end\n']
+        self.assertEqual(list(self.engine.iter_words(pages)), self.engine.tokenize(''.join(pages)))
+
+
+class WindowedCheckTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = PlagiarismEngine()
+        self.database = get_sample_database()
+        self.text = build_submission(self.database)
+
+    def test_single_window_matches_in_memory_check(self):
+        expected = self.engine.check_plagiarism(self.text, self.database)
+        self.engine.memory_budget = 1 << 20
+        self.assertEqual(self.engine.check_plagiarism(self.text, self.database), expected)
+
+    def test_sequences_merge_across_window_boundaries(self):
+        expected = self.engine.check_plagiarism(self.text, self.database)
+        self.engine.window_overlap = 6
+        self.engine.memory_budget = 2 * 20 * self.engine.window_bytes_per_word
+        self.assertEqual(self.engine.get_window_size(), 20)
+        results = self.engine.check_plagiarism(self.text, self.database)
+        self.assertEqual(sequence_spans(results), sequence_spans(expected))
+        self.assertEqual(results['overall_similarity'], expected['overall_similarity'])
+        self.assertEqual(results['total_words'], expected['total_words'])
+
+    def test_sources_are_split_into_passes_within_budget(self):
+        expected = self.engine.check_plagiarism(self.text, self.database)
+        self.engine.window_overlap = 6
+        self.engine.memory_budget = 2 * 20 * self.engine.window_bytes_per_word
+        passes = []
+        match_windowed = self.engine.match_windowed
+        self.engine.match_windowed = lambda read_chunks, group: passes.append(len(group)) or \
+            match_windowed(read_chunks, group)
+        results = self.engine.check_plagiarism(self.text, self.database)
+        self.assertEqual(len(passes), len(expected['matches']))
+        self.assertEqual(sequence_spans(results), sequence_spans(expected))
+
+    def test_windowed_sequences_never_overlap_in_submission(self):
+        rng = random.Random(3)
+        vocab = ['w%d' % i for i in range(12)]
+        self.engine.window_overlap = 6
+        self.engine.memory_budget = 2 * 20 * self.engine.window_bytes_per_word
+        for _ in range(100):
+            source = [rng.choice(vocab) for _ in range(80)]
+            words = []
+            while len(words) < 120:
+                start = rng.randrange(len(source))
+                words += source[start:start + rng.randint(3, 25)] + [rng.choice(vocab)]
+            text = ' '.join(words)
+            results = self.engine.check_plagiarism(text, [{'source': 's', 'text': ' '.join(source)}])
+            for match in results['matches']:
+                end = 0
+                for seq in match['matched_sequences']:
+                    position, length = seq['position'], seq['length']
+                    self.assertGreaterEqual(position, end)
+                    self.assertGreaterEqual(length, self.engine.min_match_length)
+                    self.assertEqual(words[position:position + length], seq['text'].split())
+                    self.assertEqual(source[seq['source_position']:seq['source_position'] + length],
+                                     seq['text'].split())
+                    end = position + length
+
+    def test_check_file_streams_text_files(self):
+        expected = self.engine.check_plagiarism(self.text, self.database)
+        with tempfile.TemporaryDirectory() as folder:
+            filepath = os.path.join(folder, 'essay.txt')
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(self.text)
+            self.engine.read_chunk_chars = 37
+            self.assertEqual(self.engine.check_file(filepath, self.database), expected)
+
+    def test_memory_budget_streams_every_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            filepath = os.path.join(folder, 'essay.txt')
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(self.text)
+            self.assertFalse(self.engine.should_stream(filepath))
+            self.engine.memory_budget = 1 << 20
+            self.assertTrue(self.engine.should_stream(filepath))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main import PlagiarismEngine, TextReportExporter, get_exporter, export_results
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.engine = PlagiarismEngine()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.folder.name, name)
+
+    def test_html_source_column_uses_the_matched_document(self):
+        database = [
+            {'source': 'notes', 'url': 'b/notes.txt',
+             'text': 'lorem ipsum dolor sit amet consectetur adipiscing elit sed do first'},
+            {'source': 'notes', 'url': 'a/notes.txt',
+             'text': 'alpha beta gamma delta epsilon zeta eta theta iota kappa second'},
+        ]
+        text = 'lorem ipsum dolor sit amet consectetur adipiscing elit sed do'
+        results = self.engine.check_plagiarism(text, database)
+        export_results(self.path('report.html'), results, 'essay.txt', text, self.engine)
+        with open(self.path('report.html'), encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn('</mark> first', report)
+        self.assertNotIn('second', report)
+
+    def test_html_marks_truncated_source_context(self):
+        source = ' '.join('w%d' % i for i in range(60))
+        text = ' '.join('w%d' % i for i in range(20, 30))
+        results = self.engine.check_plagiarism(text, [{'source': 'long', 'text': source}])
+        export_results(self.path('report.html'), results, 'essay.txt', text, self.engine)
+        with open(self.path('report.html'), encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn('<td>… w8 w9', report)
+        self.assertIn('w41 …</td>', report)
+
+    def test_unknown_extensions_fall_back_to_text(self):
+        self.assertIsInstance(get_exporter(self.path('report.md')), TextReportExporter)
+        results = self.engine.check_plagiarism('some pasted text', [])
+        export_results(self.path('report.log'), results)
+        with open(self.path('report.log'), encoding='utf-8') as f:
+            self.assertIn('PLAGIARISM DETECTION REPORT', f.read())
+
+    def test_export_cohort_command(self):
+        for name in ('one.txt', 'two.txt'):
+            with open(self.path(name), 'w', encoding='utf-8') as f:
+                f.write('Academic integrity is the moral code or ethical policy of academia.')
+        subprocess.run(
+            [sys.executable, str(ROOT / 'main.py'), 'export-cohort', self.path('cohort.json'),
+             self.path('one.txt'), self.path('two.txt'), '--db', self.path('missing.db')],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        with open(self.path('cohort.json'), encoding='utf-8') as f:
+            reports = json.load(f)
+        self.assertEqual([r['document'] for r in reports], [self.path('one.txt'), self.path('two.txt')])
+        self.assertTrue(all(r['matches'] for r in reports))
+
+    def test_export_cohort_skips_its_own_output(self):
+        folder = self.path('cohort')
+        os.makedirs(folder)
+        with open(os.path.join(folder, 'essay.txt'), 'w', encoding='utf-8') as f:
+            f.write('Academic integrity is the moral code or ethical policy of academia.')
+        output = os.path.join(folder, 'report.txt')
+        subprocess.run(
+            [sys.executable, str(ROOT / 'main.py'), 'export-cohort', output, folder,
+             '--db', self.path('missing.db')],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        with open(output, encoding='utf-8') as f:
+            report = f.read()
+        self.assertEqual(report.count('PLAGIARISM DETECTION REPORT'), 1)
+        self.assertNotIn('Document: ' + output, report)
+
+    def test_export_cohort_accepts_memory_budget(self):
+        with open(self.path('one.txt'), 'w', encoding='utf-8') as f:
+            f.write('Academic integrity is the moral code or ethical policy of academia.')
+        reports = []
+        for options in ([], ['--memory-budget', '0.01']):
+            output = self.path('cohort%d.json' % len(reports))
+            subprocess.run(
+                [sys.executable, str(ROOT / 'main.py'), 'export-cohort', output, self.path('one.txt'),
+                 '--db', self.path('missing.db')] + options,
+                check=True, stdout=subprocess.DEVNULL
+            )
+            with open(output, encoding='utf-8') as f:
+                reports.append(json.load(f)[0])
+        self.assertEqual(reports[0]['matches'], reports[1]['matches'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import CorpusIndex, PlagiarismEngine, get_sample_database, ingest_corpus, load_reference_database
+
+
+class IngestCorpusTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.folder.name, 'corpus')
+        os.makedirs(os.path.join(self.root, 'a'))
+        os.makedirs(os.path.join(self.root, 'b'))
+        for name, doc in zip(['a/notes.txt', 'b/notes.txt'], get_sample_database()):
+            with open(os.path.join(self.root, name), 'w', encoding='utf-8') as f:
+                f.write(doc['text'])
+        self.db_path = os.path.join(self.folder.name, 'corpus.db')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def ingest(self, path, **kwargs):
+        return ingest_corpus([path], self.db_path, workers=1, batch_size=1, **kwargs)
+
+    def keys(self):
+        with sqlite3.connect(self.db_path) as connection:
+            return sorted(key for key, in connection.execute('SELECT key FROM documents'))
+
+    def test_resume_is_independent_of_path_spelling(self):
+        self.assertEqual(self.ingest(self.root)['ingested'], 2)
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.root)
+            self.assertEqual(self.ingest('.')['skipped'], 2)
+            os.chdir(self.folder.name)
+            self.assertEqual(self.ingest('corpus/a/../b')['skipped'], 1)
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(len(self.keys()), 2)
+
+    def test_unreadable_entries_are_recorded_as_failures(self):
+        os.symlink(os.path.join(self.root, 'missing.txt'), os.path.join(self.root, 'a', 'dangling.txt'))
+        with open(os.path.join(self.root, 'broken.zip'), 'w') as f:
+            f.write('not a zip')
+        with zipfile.ZipFile(os.path.join(self.root, 'good.zip'), 'w') as archive:
+            archive.writestr('inner/essay.txt', get_sample_database()[2]['text'])
+
+        stats = self.ingest(self.root)
+        self.assertEqual((stats['ingested'], stats['failed']), (3, 2))
+        self.assertIn(os.path.realpath(os.path.join(self.root, 'good.zip')) + '::inner/essay.txt', self.keys())
+
+    def test_index_scores_match_in_memory_check(self):
+        self.ingest(self.root)
+        engine = PlagiarismEngine()
+        text = get_sample_database()[0]['text'] + ' ' + get_sample_database()[1]['text']
+        database = load_reference_database(self.db_path)
+        indexed = engine.check_plagiarism(text, database[-1:])
+        expected = engine.check_plagiarism(text, get_sample_database()[:2])
+        self.assertEqual([m['similarity'] for m in indexed['matches']],
+                         [m['similarity'] for m in expected['matches']])
+        self.assertEqual([m['matched_sequences'] for m in indexed['matches']],
+                         [m['matched_sequences'] for m in expected['matches']])
+        database[-1].close()
+
+    def test_open_index_sees_documents_ingested_later(self):
+        self.ingest(self.root)
+        engine = PlagiarismEngine()
+        index = CorpusIndex(self.db_path)
+        try:
+            engine.check_plagiarism(get_sample_database()[0]['text'], [index])
+            self.assertFalse(index.connection.in_transaction)
+
+            added = os.path.join(self.folder.name, 'added.txt')
+            with open(added, 'w', encoding='utf-8') as f:
+                f.write(get_sample_database()[4]['text'])
+            self.ingest(added)
+
+            results = engine.check_plagiarism(get_sample_database()[4]['text'], [index])
+            self.assertIn(os.path.realpath(added), [m['url'] for m in results['matches']])
+        finally:
+            index.close()
+
+    def test_batches_flush_on_buffered_archive_bytes(self):
+        with zipfile.ZipFile(os.path.join(self.folder.name, 'big.zip'), 'w') as archive:
+            for i in range(4):
+                archive.writestr(f'member{i}.txt', get_sample_database()[i]['text'] * 20)
+        flushes = []
+        ingest_corpus([os.path.join(self.folder.name, 'big.zip')], self.db_path, workers=1,
+                      batch_size=100, progress=lambda stats: flushes.append(stats['ingested']),
+                      batch_bytes=1000)
+        self.assertEqual(flushes, [1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()